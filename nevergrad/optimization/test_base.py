@@ -24,7 +24,7 @@ class CounterFunction:
     def __call__(self, value: base.ArrayLike) -> float:
         assert len(value) == 1
         self.count += 1
-        return float(value[0] - 1)**2
+        return (value[0] - 1.0)**2
 
 
 class LoggingOptimizer(base.Optimizer):
@@ -32,10 +32,12 @@ class LoggingOptimizer(base.Optimizer):
     def __init__(self, num_workers: int = 1) -> None:
         super().__init__(instrumentation=1, budget=5, num_workers=num_workers)
         self.logs: tp.List[str] = []
+        self._scratch = np.zeros(1)
 
     def _internal_ask(self) -> base.ArrayLike:
         self.logs.append(f"s{self._num_ask}")  # s for suggest
-        return np.array((float(self._num_ask),))
+        self._scratch[0] = self._num_ask
+        return self._scratch.copy()  # copy since the caller may keep a reference
 
     def _internal_tell(self, x: base.ArrayLike, value: float) -> None:
         self.logs.append(f"u{int(x[0])}")  # u for update
@@ -119,11 +121,15 @@ def test_optimize_and_dump(tmp_path: Path) -> None:
 def test_compare() -> None:
     optimizer = optimizerlib.CMA(instrumentation=3, budget=1000, num_workers=5)
     optimizerlib.addCompare(optimizer)
+    target = np.array((1., 1., 1.))
+
+    def squared_dist(candidate: tp.Any) -> float:  # same ordering as the norm, without the sqrt
+        diff = candidate.data - target
+        return float(diff.dot(diff))
+
     for _ in range(1000):  # TODO make faster test
-        x: tp.List[tp.Any] = []
-        for _ in range(6):
-            x += [optimizer.ask()]
-        winners = sorted(x, key=lambda x_: np.linalg.norm(x_.data - np.array((1., 1., 1.))))
+        x: tp.List[tp.Any] = [optimizer.ask() for _ in range(6)]
+        winners = sorted(x, key=squared_dist)
         optimizer.compare(winners[:3], winners[3:])  # type: ignore
     result = optimizer.provide_recommendation()
     print(result)
@@ -132,9 +138,14 @@ def test_compare() -> None:
 
 class StupidFamily(base.OptimizerFamily):
 
+    def __init__(self, **kwargs: tp.Any) -> None:
+        super().__init__(**kwargs)
+        self._resolved_class: tp.Optional[tp.Union[base.OptimizerFamily, tp.Type[base.Optimizer]]] = None
+
     def __call__(self, instrumentation: IntOrParameter, budget: tp.Optional[int] = None, num_workers: int = 1) -> base.Optimizer:
-        class_ = base.registry["Zero"] if self._kwargs.get("zero", True) else base.registry["StupidRandom"]
-        run = class_(instrumentation=instrumentation, budget=budget, num_workers=num_workers)
+        if self._resolved_class is None:
+            self._resolved_class = base.registry["Zero"] if self._kwargs.get("zero", True) else base.registry["StupidRandom"]
+        run = self._resolved_class(instrumentation=instrumentation, budget=budget, num_workers=num_workers)
         run.name = self._repr
         return run
 
@@ -3,7 +3,7 @@
 # This source code is licensed under the MIT license found in the
 # LICENSE file in the root directory of this source tree.
 
-from typing import List, Optional, Type
+from typing import Any, List, Optional, Type
 import pytest
 import numpy as np
 from ..common import testing
@@ -18,6 +18,8 @@ from . import transforms
     arctan=(transforms.ArctanBound(3, 4), "At(3,4)"),
     cumdensity=(transforms.CumulativeDensity(), "Cd()"),
     clipping=(transforms.Clipping(None, 1e12), "Cl(None,1000000000000.0)"),
+    pipeline=(transforms.TransformPipeline(transforms.Affine(3, 4), transforms.Affine(.5, 1), transforms.ArctanBound(3, 4)),
+              "Pl(Af(3,4),Af(0.5,1),At(3,4))"),
 )
 def test_back_and_forth(transform: transforms.Transform, string: str) -> None:
     x = np.random.normal(0, 1, size=12)
@@ -28,19 +30,70 @@ def test_back_and_forth(transform: transforms.Transform, string: str) -> None:
     print(f"{transform}")
 
 
+def test_repr_update() -> None:
+    transform = transforms.Affine(2, 3)
+    reverted = transform.reverted()
+    assert "name=Af(2,3)" in repr(transform)
+    assert "name=Af(2,3)" in repr(reverted)
+    transform.name = "foo"
+    assert "name=foo" in repr(transform)
+    assert "name=foo" in repr(reverted)
+
+
 @testing.parametrized(
     affine=(transforms.Affine(3, 4), [0, 1, 2], [4, 7, 10]),
     reverted=(transforms.Affine(3, 4).reverted(), [4, 7, 10], [0, 1, 2]),
     exponentiate=(transforms.Exponentiate(10, -1.), [0, 1, 2], [1, .1, .01]),
     tanh=(transforms.TanhBound(3, 5), [-100000, 100000, 0], [3, 5, 4]),
+    tanh_single=(transforms.TanhBound([3], [5]), [-100000, 100000, 0], [3, 5, 4]),
     arctan=(transforms.ArctanBound(3, 5), [-100000, 100000, 0], [3, 5, 4]),
     cumdensity=(transforms.CumulativeDensity(), [-10, 0, 10], [0, .5, 1]),
+    pipeline=(transforms.TransformPipeline(transforms.Affine(2, 0), transforms.Affine(3, 1), transforms.TanhBound(3, 5)),
+              [-100000, 100000, -1 / 6.], [3, 5, 4]),
+    pipeline_0d=(transforms.TransformPipeline(transforms.TanhBound(3, 5), transforms.Affine(2, 1)), 0., 9.),
 )
 def test_vals(transform: transforms.Transform, x: List[float], expected: List[float]) -> None:
     y = transform.forward(np.array(x))
     np.testing.assert_almost_equal(y, expected, decimal=5)
 
 
+def test_affine_out() -> None:
+    transform = transforms.Affine(2, .5)
+    x = np.array([0, 1, 2])
+    out = np.zeros(3)
+    y = transform.forward(x, out=out)
+    assert y is out
+    np.testing.assert_array_equal(y, [.5, 2.5, 4.5])
+    np.testing.assert_array_equal(transform.backward(y), x)
+    transform.backward(y, out=y)
+    np.testing.assert_array_equal(out, x)
+    # non-array inputs
+    y = transform.forward(3.)  # type: ignore
+    assert isinstance(y, float) and y == 6.5
+    assert transform.backward(6.5) == 3.  # type: ignore
+    np.testing.assert_array_equal(transform.forward([0, 1]), [.5, 2.5])  # type: ignore
+    np.testing.assert_array_equal(transform.backward([.5, 2.5]), [0, 1])  # type: ignore
+
+
+def test_pipeline_inplace() -> None:
+    steps = [transforms.Clipping(0, 1), transforms.Affine(2, 1), transforms.Affine(3, 0), transforms.TanhBound(-100, 100)]
+    pipeline = transforms.TransformPipeline(*steps)
+    x = np.array([-1., .5, 2.])
+    expected = x
+    for step in steps:
+        expected = step.forward(expected)
+    y = pipeline.forward(x)
+    np.testing.assert_array_almost_equal(y, expected)
+    np.testing.assert_array_equal(x, [-1, .5, 2])  # input is not modified
+    expected = y
+    for step in reversed(steps):
+        expected = step.backward(expected)
+    z = pipeline.backward(y)
+    np.testing.assert_array_almost_equal(z, expected)
+    np.testing.assert_array_almost_equal(z, [0, .5, 1])
+    np.testing.assert_array_equal(y, pipeline.forward(x))  # input is not modified
+
+
 @testing.parametrized(
     tanh=(transforms.TanhBound(0, 5), [2, 4], None),
     tanh_err=(transforms.TanhBound(0, 5), [2, 4, 6], ValueError),
@@ -68,6 +121,9 @@ def test_multibounds(transform_cls: Type[transforms.BoundTransform], expected: L
     transform = transform_cls([0, 0], [1, 100])
     output = transform.forward(np.array([100, 90]))
     np.testing.assert_almost_equal(output, expected, decimal=2)
+    transform.backward(np.array([.5, 50]))
+    with pytest.raises(ValueError):
+        transform.backward(np.array([.5, 150]))
     # shapes
     with pytest.raises(ValueError):
         transform.forward(np.array([-3, 5, 4]))
@@ -81,10 +137,36 @@ def test_multibounds(transform_cls: Type[transforms.BoundTransform], expected: L
         transform_cls(None, None)
 
 
+@testing.parametrized(
+    tanh_array=(transforms.TanhBound([0, 0], [1, 1]), np.float32, np.float64),
+    arctan_array=(transforms.ArctanBound([0, 0], [1, 1]), np.float32, np.float64),
+    arctan_int=(transforms.ArctanBound([0, 0], [1, 1]), int, np.float64),
+    tanh_scalar=(transforms.TanhBound(0, 1), np.float32, np.float32),
+)
+def test_bound_dtypes(transform: transforms.Transform, dtype: Type[Any], expected: Type[Any]) -> None:
+    y = transform.forward(np.array([0, 1], dtype=dtype))
+    assert y.dtype == expected
+    assert transform.backward(y).dtype == expected
+
+
 @testing.parametrized(
     both_sides=(transforms.Clipping(0, 1), [0, 1.]),
     one_side=(transforms.Clipping(a_max=1), [-3, 1.]),
 )
 def test_clipping(transform: transforms.Transform, expected: List[float]) -> None:
-    y = transform.forward(np.array([-3, 5]))
+    x = np.array([-3, 5])
+    y = transform.forward(x)
     np.testing.assert_array_equal(y, expected)
+    assert y.dtype == x.dtype  # integer data with integer bounds stays integer
+
+
+@testing.parametrized(
+    both_sides=(transforms.Clipping(0, 1), [0, 1, .5]),
+    max_only=(transforms.Clipping(a_max=1), [-3, 1, .5]),
+    min_only=(transforms.Clipping(a_min=0), [0, 5, .5]),
+)
+def test_clipping_inplace(transform: transforms.Clipping, expected: List[float]) -> None:
+    x = np.array([-3, 5, .5])
+    y = transform.forward(x, out=x)
+    assert y is x
+    np.testing.assert_array_equal(x, expected)
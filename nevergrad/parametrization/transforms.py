@@ -4,9 +4,9 @@
 # LICENSE file in the root directory of this source tree.
 
 import uuid
-from typing import Optional, Union, Tuple
+from typing import Any, Optional, Union, Tuple, List, Iterable
 import numpy as np
-from scipy import stats
+from scipy import special
 from ..common.typetools import ArrayLike
 
 
@@ -17,8 +17,28 @@ class Transform:
     for each transform.
     """
 
+    _cache_repr = True  # deactivated for transforms whose representation depends on other transforms
+
     def __init__(self) -> None:
-        self.name = uuid.uuid4().hex  # a name for easy identification. This random uuid should be overriden
+        self._name: Optional[str] = None
+        self._repr_cache: Optional[str] = None
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if not name.startswith("_"):  # public attributes are part of the representation
+            super().__setattr__("_repr_cache", None)
+        super().__setattr__(name, value)
+
+    @property
+    def name(self) -> str:
+        """A name for easy identification. This should be overriden, otherwise a random uuid is used.
+        """
+        if self._name is None:
+            self._name = uuid.uuid4().hex
+        return self._name
+
+    @name.setter
+    def name(self, name: str) -> None:
+        self._name = name
 
     def forward(self, x: np.ndarray) -> np.ndarray:
         raise NotImplementedError
@@ -30,8 +50,14 @@ class Transform:
         return Reverted(self)
 
     def __repr__(self) -> str:
-        args = ", ".join(f"{x}={y}" for x, y in sorted(self.__dict__.items()) if not x.startswith("_"))
-        return f"{self.__class__.__name__}({args})"
+        if self._repr_cache is not None:
+            return self._repr_cache
+        attributes = dict(self.__dict__, name=self.name)
+        args = ", ".join(f"{x}={y}" for x, y in sorted(attributes.items()) if not x.startswith("_"))
+        representation = f"{self.__class__.__name__}({args})"
+        if self._cache_repr:
+            self._repr_cache = representation
+        return representation
 
 
 class Reverted(Transform):
@@ -42,6 +68,8 @@ class Reverted(Transform):
     transform: Transform
     """
 
+    _cache_repr = False
+
     def __init__(self, transform: Transform) -> None:
         super().__init__()
         self.transform = transform
@@ -69,13 +97,26 @@ class Affine(Transform):
             raise ValueError('"a" parameter should be non-zero to prevent information loss.')
         self.a = a
         self.b = b
+        self._inv_a = 1. / a
         self.name = f"Af({self.a},{self.b})"
 
-    def forward(self, x: np.ndarray) -> np.ndarray:
-        return self.a * x + self.b  # type: ignore
-
-    def backward(self, y: np.ndarray) -> np.ndarray:
-        return (y - self.b) / self.a  # type: ignore
+    def forward(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is None:
+            if not isinstance(x, np.ndarray):  # scalars and sequences, no buffer to work with
+                return self.a * np.asarray(x) + self.b  # type: ignore
+            out = np.empty_like(x, dtype=np.result_type(x, self.a, self.b))
+        np.multiply(x, self.a, out=out)
+        np.add(out, self.b, out=out)
+        return out
+
+    def backward(self, y: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        if out is None:
+            if not isinstance(y, np.ndarray):
+                return (np.asarray(y) - self.b) * self._inv_a  # type: ignore
+            out = np.empty_like(y, dtype=np.result_type(y, self.a, self.b, 1.))
+        np.subtract(y, self.b, out=out)
+        np.multiply(out, self._inv_a, out=out)
+        return out
 
 
 class Exponentiate(Transform):
@@ -92,13 +133,16 @@ class Exponentiate(Transform):
         super().__init__()
         self.base = base
         self.coeff = coeff
+        self._coeff = float(coeff)
+        self._inv_log = 1. / (self._coeff * np.log(base))
         self.name = f"Ex({self.base},{self.coeff})"
 
     def forward(self, x: np.ndarray) -> np.ndarray:
-        return self.base ** (float(self.coeff) * x)  # type: ignore
+        # power is kept over exp(log(base) * coeff * x) since it is exact for integer powers
+        return self.base ** (self._coeff * x)  # type: ignore
 
     def backward(self, y: np.ndarray) -> np.ndarray:
-        return np.log(y) / (float(self.coeff) * np.log(self.base))  # type: ignore
+        return np.log(y) * self._inv_log  # type: ignore
 
 
 class BoundTransform(Transform):  # pylint: disable=abstract-method
@@ -111,19 +155,25 @@ class BoundTransform(Transform):  # pylint: disable=abstract-method
         super().__init__()
         self.a_min: Optional[np.ndarray] = None
         self.a_max: Optional[np.ndarray] = None
+        # scalar bounds are also kept as is, since numpy is faster at broadcasting them
+        self._a_min_scalar: Optional[float] = None
+        self._a_max_scalar: Optional[float] = None
         for name, value in [("a_min", a_min), ("a_max", a_max)]:
             if value is not None:
                 isarray = isinstance(value, (tuple, list, np.ndarray))
                 setattr(self, name, np.array(value, copy=False) if isarray else np.array([value]))
+                if not isarray:
+                    setattr(self, f"_{name}_scalar", value)
         if not (self.a_min is None or self.a_max is None):
             if (self.a_min >= self.a_max).any():
                 raise ValueError(f"Lower bounds {a_min} should be strictly smaller than upper bounds {a_max}")
         if self.a_min is None and self.a_max is None:
             raise ValueError("At least one bound must be specified")
         self.shape: Tuple[int, ...] = self.a_min.shape if self.a_min is not None else self.a_max.shape
+        self._shape_check: bool = self.shape != (1,)  # bounds of shape (1,) apply to data of any shape
 
     def _check_shape(self, x: np.ndarray) -> None:
-        if self.shape != (1,) and x.shape != self.shape:
+        if self._shape_check and x.shape != self.shape:
             raise ValueError(f"Shapes do not match: {self.shape} and {x.shape}")
 
 
@@ -145,20 +195,30 @@ class TanhBound(BoundTransform):
         super().__init__(a_min=a_min, a_max=a_max)
         if self.a_min is None or self.a_max is None:
             raise ValueError("Both bounds must be specified")
-        self._b = .5 * (self.a_max + self.a_min)
-        self._a = .5 * (self.a_max - self.a_min)
+        self._b: Union[float, np.ndarray] = .5 * (self.a_max + self.a_min)
+        self._a: Union[float, np.ndarray] = .5 * (self.a_max - self.a_min)
+        if np.shape(self._a) == (1,):  # single bounds (scalar or not) are faster to broadcast as floats
+            self._b, self._a = float(self._b[0]), float(self._a[0])
+        self._inv_a = 1. / self._a
         self.name = f"Th({a_min},{a_max})"
 
     def forward(self, x: np.ndarray) -> np.ndarray:
         self._check_shape(x)
-        return self._b + self._a * np.tanh(x)  # type: ignore
+        # the affine part is computed in place to avoid temporaries, in a buffer of the output dtype
+        out = np.tanh(x, dtype=np.result_type(x, self._a, self._b))
+        out *= self._a
+        out += self._b
+        return out  # type: ignore
 
     def backward(self, y: np.ndarray) -> np.ndarray:
         self._check_shape(y)
         if (y > self.a_max).any() or (y < self.a_min).any():
             raise ValueError(f"Only data between {self.a_min} and {self.a_max} "
                              "can be transformed back (bounds lead to infinity).")
-        return np.arctanh((y - self._b) / self._a)  # type: ignore
+        # single buffer, updated in place
+        out = np.asarray(np.subtract(y, self._b, dtype=np.result_type(y, self._b, self._inv_a)))
+        out *= self._inv_a
+        return np.arctanh(out, out=out)  # type: ignore
 
 
 class Clipping(BoundTransform):
@@ -176,15 +236,24 @@ class Clipping(BoundTransform):
         a_max: Optional[Union[ArrayLike, float]] = None
     ) -> None:
         super().__init__(a_min=a_min, a_max=a_max)
+        a_min_, a_max_ = (array if scalar is None else scalar for array, scalar in
+                          [(self.a_min, self._a_min_scalar), (self.a_max, self._a_max_scalar)])
+        # one-sided clipping is faster through np.maximum/np.minimum than through np.clip
+        self._clip_func: Any = np.clip
+        self._clip_args: Tuple[Any, ...] = (a_min_, a_max_)
+        if a_min_ is None:
+            self._clip_func, self._clip_args = np.minimum, (a_max_,)
+        elif a_max_ is None:
+            self._clip_func, self._clip_args = np.maximum, (a_min_,)
         self.name = f"Cl({a_min},{a_max})"
 
-    def forward(self, x: np.ndarray) -> np.ndarray:
+    def forward(self, x: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
         self._check_shape(x)
-        return np.clip(x, self.a_min, self.a_max)  # type: ignore
+        return self._clip_func(x, *self._clip_args, out=out)  # type: ignore
 
     def backward(self, y: np.ndarray) -> np.ndarray:
         self._check_shape(y)
-        if (self.a_max is not None and np.max(y) > self.a_max) or (self.a_min is not None and np.min(y) < self.a_min):
+        if (self.a_max is not None and (y > self.a_max).any()) or (self.a_min is not None and (y < self.a_min).any()):
             raise ValueError(f"Only data between {self.a_min} and {self.a_max} "
                              "can be transformed back.")
         return y
@@ -208,19 +277,29 @@ class ArctanBound(BoundTransform):
         super().__init__(a_min=a_min, a_max=a_max)
         if self.a_min is None or self.a_max is None:
             raise ValueError("Both bounds must be specified")
-        self._b = .5 * (self.a_max + self.a_min)
-        self._a = (self.a_max - self.a_min) / np.pi
+        self._b: Union[float, np.ndarray] = .5 * (self.a_max + self.a_min)
+        self._a: Union[float, np.ndarray] = (self.a_max - self.a_min) / np.pi
+        if np.shape(self._a) == (1,):  # single bounds (scalar or not) are faster to broadcast as floats
+            self._b, self._a = float(self._b[0]), float(self._a[0])
+        self._inv_a = 1. / self._a
         self.name = f"At({a_min},{a_max})"
 
     def forward(self, x: np.ndarray) -> np.ndarray:
         self._check_shape(x)
-        return self._b + self._a * np.arctan(x)  # type: ignore
+        # the affine part is computed in place to avoid temporaries, in a buffer of the output dtype
+        out = np.arctan(x, dtype=np.result_type(x, self._a, self._b))
+        out *= self._a
+        out += self._b
+        return out  # type: ignore
 
     def backward(self, y: np.ndarray) -> np.ndarray:
         self._check_shape(y)
-        if np.max(y) > self.a_max or np.min(y) < self.a_min:
+        if (y > self.a_max).any() or (y < self.a_min).any():
             raise ValueError(f"Only data between {self.a_min} and {self.a_max} can be transformed back.")
-        return np.tan((y - self._b) / self._a)  # type: ignore
+        # single buffer, updated in place
+        out = np.asarray(np.subtract(y, self._b, dtype=np.result_type(y, self._b, self._inv_a)))
+        out *= self._inv_a
+        return np.tan(out, out=out)  # type: ignore
 
 
 class CumulativeDensity(Transform):
@@ -233,9 +312,55 @@ class CumulativeDensity(Transform):
         self.name = "Cd()"
 
     def forward(self, x: np.ndarray) -> np.ndarray:
-        return stats.norm.cdf(x)  # type: ignore
+        return special.ndtr(x)  # type: ignore
 
     def backward(self, y: np.ndarray) -> np.ndarray:
         if np.max(y) > 1 or np.min(y) < 0:
             raise ValueError("Only data between 0 and 1 can be transformed back (bounds lead to infinity).")
-        return stats.norm.ppf(y)  # type: ignore
+        return special.ndtri(y)  # type: ignore
+
+
+class TransformPipeline(Transform):
+    """Sequence of transforms, applied in order in forward and in reverse order in backward.
+    Consecutive affine transforms are merged into one, and affine transforms update the
+    intermediate arrays in place instead of allocating new ones. Intermediate arrays sharing
+    memory with the input data are never updated in place, so the input is left unchanged.
+
+    Parameters
+    ----------
+    *transforms: Transform
+    """
+
+    _cache_repr = False
+
+    def __init__(self, *transforms: Transform) -> None:
+        super().__init__()
+        if not transforms:
+            raise ValueError("At least one transform must be provided")
+        self.transforms = transforms
+        self._steps: List[Transform] = []
+        for transform in transforms:
+            previous = self._steps[-1] if self._steps else None
+            if isinstance(transform, Affine) and isinstance(previous, Affine):
+                self._steps[-1] = Affine(previous.a * transform.a, transform.a * previous.b + transform.b)
+            else:
+                self._steps.append(transform)
+        self.name = f"Pl({','.join(t.name for t in transforms)})"
+
+    def forward(self, x: np.ndarray) -> np.ndarray:
+        return self._apply(x, self._steps, backward=False)
+
+    def backward(self, y: np.ndarray) -> np.ndarray:
+        return self._apply(y, reversed(self._steps), backward=True)
+
+    @staticmethod
+    def _apply(x: np.ndarray, steps: Iterable[Transform], backward: bool) -> np.ndarray:
+        data = x
+        for step in steps:
+            # only float arrays allocated within the pipeline can be updated in place
+            inplace = isinstance(step, Affine) and isinstance(x, np.ndarray) and x.dtype.kind == "f"
+            if inplace and x is not data and not np.may_share_memory(x, data):
+                (step.backward if backward else step.forward)(x, out=x)  # type: ignore
+            else:
+                x = step.backward(x) if backward else step.forward(x)
+        return x